@@ -0,0 +1,47 @@
+"""Compares memory used while dumping large document.
+basic: dump(to_basic()) which was used before _dump_connection
+stream: _dump_connection which serializes connection tree directly
+
+Memory is measured with tracemalloc as peak above memory used before dump.
+Process RSS is not used because memory freed after loading is reused by allocator
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from hotmarkup import JsonConnection, YamlConnection
+
+
+def make_document(size: int) -> dict:
+    return {f'item_{i}': {'id': i, 'name': f'name {i}', 'tags': ['a', 'b', 'c'], 'value': i / 3}
+            for i in range(size)}
+
+
+def measure(func):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - before, elapsed
+
+
+def main(size: int):
+    directory = tempfile.mkdtemp()
+    for connection_type, extension in ((JsonConnection, 'json'), (YamlConnection, 'yaml')):
+        path = os.path.join(directory, f'document.{extension}')
+        connection = connection_type(path, override=make_document(size), save=False, reload=False)
+        for mode, func in (('basic', lambda: connection.dump(connection.to_basic())),
+                           ('stream', connection._dump_connection)):
+            peak, elapsed = measure(func)
+            print(f'{connection_type.__name__:<16}{mode:<8}peak {peak / 2 ** 20:8.2f} MiB  time {elapsed:6.2f} s')
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
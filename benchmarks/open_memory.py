@@ -0,0 +1,51 @@
+"""Measures memory per connection node and time of opening large document.
+Memory is measured with tracemalloc as memory held by connection tree after open.
+Time is measured in separate run without tracemalloc
+"""
+import sys
+import time
+import tracemalloc
+
+from hotmarkup.conenction import Connection, RootConnection
+
+
+def make_document(size: int, depth: int = 4) -> dict:
+    def make_node(level: int):
+        if level == depth:
+            return {'id': level, 'value': 'leaf'}
+        return {f'node_{level}': make_node(level + 1), 'items': [{'id': level}]}
+    return {f'item_{i}': make_node(0) for i in range(size)}
+
+
+class MemoryConnection(RootConnection):
+    def __init__(self, data, **kwargs):
+        self._data = data
+        super().__init__(name='benchmark', **kwargs)
+
+    def load(self):
+        return self._data
+
+    def stamp(self):
+        return 0
+
+
+def count_nodes(connection) -> int:
+    children = connection._children.values() if isinstance(connection._children, dict) else connection._children
+    return 1 + sum(count_nodes(child) for child in children if isinstance(child, Connection))
+
+
+def main(size: int):
+    data = make_document(size)
+    start = time.perf_counter()
+    MemoryConnection(data, save=False, reload=False)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    connection = MemoryConnection(data, save=False, reload=False)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = count_nodes(connection)
+    print(f'nodes {nodes}  open {elapsed:6.2f} s  {memory / nodes:7.1f} bytes per node')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -1 +1,2 @@
 from hotmarkup.file_connection import YamlConnection, JsonConnection, PickleConnection
+from hotmarkup.registry import ConnectionRegistry, SharedConnection, open_shared
@@ -1,6 +1,9 @@
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from enum import Enum
-from typing import Union, Callable, Any
+from typing import Union, Callable, Any, ContextManager
 
 BASIC_TYPE = Union[dict, list]
 
@@ -12,40 +15,60 @@ class MutationType(Enum):
     FUNC = 'FUNC'  # conn.a.sort()
 
 
+class ConnectionContext(object):
+    """
+    ConnectionContext class
+    It keeps state shared by all connections of one tree. Root connection creates it
+    """
+    __slots__ = ('name', 'mutation_callback', 'dump_callback', 'check_callback', 'write_callback', 'flags_epoch')
+
+    def __init__(self, name: str,
+                 mutation_callback: Callable[[str, MutationType, Any], None],
+                 dump_callback: Callable[[], None],
+                 check_callback: Callable[[], None],
+                 write_callback: Callable[[], ContextManager]):
+        self.name: str = name
+        self.mutation_callback: Callable[[str, MutationType, Any], None] = mutation_callback
+        self.dump_callback: Callable[[], None] = dump_callback
+        self.check_callback: Callable[[], None] = check_callback
+        self.write_callback: Callable[[], ContextManager] = write_callback
+        self.flags_epoch: int = 0
+
+
 class Connection(object):
     """
     Connection class
     It implements base hotmarkup connection functionality
     """
+    __slots__ = ('_parent', '_key', '_context', '_children', '_fingerprint', '_mutable', '_save', '_reload')
 
-    def __init__(self, name: str, basic: BASIC_TYPE, parent,
-                 mutation_callback: Callable[[str, MutationType, Any], None],
-                 dump_callback: Callable[[], None],
-                 check_callback: Callable[[], None]):
+    def __init__(self, name, basic: BASIC_TYPE, parent,
+                 mutation_callback: Callable[[str, MutationType, Any], None] = None,
+                 dump_callback: Callable[[], None] = None,
+                 check_callback: Callable[[], None] = None,
+                 write_callback: Callable[[], ContextManager] = None):
         """
-        :param name: Connection name used for logging configuration (defaults to __name__)
+        :param name: Connection name used for logging configuration. For child connection it is key in parent
         :param basic: Data for connection
         :param parent: Connection parent. If connection is root parent equals to self
-        :param mutation_callback: Function that will be called on mutation
-        :param check_callback: Function that will be called to check if data is actual. If not function must reload data
+        :param mutation_callback: Function that will be called on mutation. Used only by root
+        :param dump_callback: Function that will be called to dump data. Used only by root
+        :param check_callback: Function that will be called to check if data is actual. If not function must reload data.
+               Used only by root
+        :param write_callback: Function returning context manager that wraps every change of data and its dump.
+               Used only by root
         """
         self._parent: Connection = parent
+        self._key = name
         if parent is self:
-            self._name: str = parent._name
+            self._context: ConnectionContext = ConnectionContext(name, mutation_callback, dump_callback,
+                                                                 check_callback, write_callback)
         else:
-            self._name: str = self._parent._name + '.' + name
-            while parent is not parent._parent:
-                parent: Connection = parent._parent
-        self._root: RootConnection = parent
-        self._logger: logging.Logger = self._root._logger
-
-        self._mutable: bool = self._parent._mutable
-        self._save: bool = self._parent._save
-        self._reload: bool = self._parent._reload
-        self._mutation_callback: Callable[[str, MutationType, Any], None] = mutation_callback
-        self._dump_callback: Callable[[], None] = dump_callback
-        self._check_callback: Callable[[], None] = check_callback
+            self._context: ConnectionContext = parent._context
+            # Flags are inherited from parents until setter is called
+            self._mutable = self._save = self._reload = None
 
+        self._fingerprint: int = None
         self._children = None
         self._load_from_basic(basic)
 
@@ -54,63 +77,72 @@ class Connection(object):
                 (isinstance(self._children, dict) and key in self._children and self._children[key] == value):
             return
         if not self.mutable:
-            raise RuntimeError(f'Value {self._name + "." + key} is immutable')
-        if isinstance(self._children, list):
-            existed = True
-        else:
-            existed = key in self._children
-        if isinstance(value, (list, dict)):
-            self._children[key] = Connection(str(key), value, self, self._mutation_callback,
-                                             self._dump_callback, self._check_callback)
-        else:
-            self._children[key] = value
-        self._mutation_callback(self._name + '.' + str(key),
-                                MutationType.UPDATE if existed else MutationType.NEW, value)
-        if self._save:
-            self._dump_callback()
+            raise RuntimeError(f'Value {self._name}.{key} is immutable')
+        with self._context.write_callback():
+            if isinstance(self._children, list):
+                existed = True
+            else:
+                existed = key in self._children
+            if isinstance(value, (list, dict)):
+                self._children[key] = Connection(key, value, self)
+            else:
+                self._children[key] = value
+            self._invalidate()
+            self._context.mutation_callback(self._name + '.' + str(key),
+                                            MutationType.UPDATE if existed else MutationType.NEW, value)
+            if self.save:
+                self._context.dump_callback()
 
     def __getitem__(self, item):
-        self._check_callback()
+        self._context.check_callback()
         return self._children[item]
 
     def __delitem__(self, key):
-        del self._children[key]
-        self._mutation_callback(self._name + '.' + str(key), MutationType.DELETE, None)
-        if self._save:
-            self._dump_callback()
+        with self._context.write_callback():
+            del self._children[key]
+            self._invalidate()
+            self._context.mutation_callback(self._name + '.' + str(key), MutationType.DELETE, None)
+            if self.save:
+                self._context.dump_callback()
 
     def __setattr__(self, key, value):
-        if key.startswith('_') or key in dir(self) or key in dir(self.__class__):
+        if key.startswith('_') or key in dir(self.__class__):
             super(Connection, self).__setattr__(key, value)
             return
         self[key] = value
 
     def __getattr__(self, item):
-        if item in dir(self) or item in dir(self.__class__):
+        if item in dir(self.__class__):
             return super(Connection, self).__getattribute__(item)
         if item in self._children.__dir__():
-            self._check_callback()
+            self._context.check_callback()
+
+            def children_snapshot():
+                # Values are referenced, so ids of replaced values can't be reused by new ones
+                if isinstance(self._children, dict):
+                    return [item for pair in self._children.items() for item in pair]
+                return list(self._children)
 
-            def children_hash():
-                return hash(tuple(self._children))
+            def children_changed(before) -> bool:
+                after = children_snapshot()
+                return len(before) != len(after) or any(old is not new for old, new in zip(before, after))
 
             def func(*args, **kwargs):
-                before = children_hash()
-                value = getattr(self._children, item)(*args, **kwargs)
-                for child in (self._children if isinstance(self._children, dict) else range(len(self._children))):
-                    if isinstance(self._children[child], BASIC_TYPE.__args__):
-                        self._children[child] = Connection(str(child), self._children[child],
-                                                           self, self._mutation_callback,
-                                                           self._dump_callback,
-                                                           self._check_callback)
-                if before != children_hash():
-                    if not self.mutable:
-                        raise RuntimeError(
-                            f'Called {type(self._children).__name__}.{item} for non-mutable instance')
-                    self._mutation_callback(self._name + '.' + item, MutationType.FUNC, self._children)
-                    if self._save:
-                        self._dump_callback()
-                return value
+                with self._context.write_callback():
+                    before = children_snapshot()
+                    value = getattr(self._children, item)(*args, **kwargs)
+                    for child in (self._children if isinstance(self._children, dict) else range(len(self._children))):
+                        if isinstance(self._children[child], BASIC_TYPE.__args__):
+                            self._children[child] = Connection(child, self._children[child], self)
+                    if children_changed(before):
+                        self._invalidate()
+                        if not self.mutable:
+                            raise RuntimeError(
+                                f'Called {type(self._children).__name__}.{item} for non-mutable instance')
+                        self._context.mutation_callback(self._name + '.' + item, MutationType.FUNC, self._children)
+                        if self.save:
+                            self._context.dump_callback()
+                    return value
 
             return func
         try:
@@ -131,55 +163,122 @@ class Connection(object):
         return self._children.__contains__(item)
 
     def __iadd__(self, other):
-        self._children.__iadd__(other)
+        with self._context.write_callback():
+            self._children.__iadd__(other)
+            self._invalidate()
+            self._context.mutation_callback(self._name + '.__iadd__', MutationType.FUNC, self._children)
+            if self.save:
+                self._context.dump_callback()
         return self
 
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if not isinstance(other, (Connection, dict, list)):
+            return NotImplemented
+        self._context.check_callback()
+        if isinstance(other, Connection):
+            other._context.check_callback()
+            try:
+                if self._get_fingerprint() != other._get_fingerprint():
+                    return False
+            except TypeError:  # Some value is not hashable
+                pass
+        # Fingerprints may collide (e.g. hash(-1) == hash(-2)) so equal fingerprints are checked structurally
+        return self._equals(other)
+
     def __repr__(self):
         return str(self.to_basic())
 
     def _load_from_basic(self, basic: BASIC_TYPE):
+        self._children = self._build_children(basic)
+        self._invalidate()
+
+    def _invalidate(self):
+        """Drops cached fingerprint of connection and its parents.
+        If fingerprint is not cached, it is not cached for parents too
+        """
+        connection = self
+        while connection._fingerprint is not None:
+            connection._fingerprint = None
+            if connection._parent is connection:
+                break
+            connection = connection._parent
+
+    def _get_fingerprint(self) -> int:
+        """Structural hash of connection. It is cached until connection or its children are mutated.
+        Raises TypeError if some value is not hashable
+        """
+        if self._fingerprint is None:
+            if isinstance(self._children, dict):
+                self._fingerprint = hash((dict, frozenset(
+                    (key, value._get_fingerprint() if isinstance(value, Connection) else hash(value))
+                    for key, value in self._children.items())))
+            else:
+                self._fingerprint = hash((list, tuple(
+                    value._get_fingerprint() if isinstance(value, Connection) else hash(value)
+                    for value in self._children)))
+        return self._fingerprint
+
+    def _equals(self, other) -> bool:
+        """Compares connection with connection or basic type structurally without converting it to basic"""
+        if isinstance(other, Connection):
+            if self._fingerprint is not None and other._fingerprint is not None and \
+                    self._fingerprint != other._fingerprint:
+                return False
+            other = other._children
         if isinstance(self._children, dict):
-            reload_false_children = {}
+            if not isinstance(other, dict) or len(self._children) != len(other):
+                return False
+            return all(key in other and _equals(value, other[key]) for key, value in self._children.items())
+        if not isinstance(other, list) or len(self._children) != len(other):
+            return False
+        return all(_equals(value, item) for value, item in zip(self._children, other))
+
+    def _build_children(self, basic: BASIC_TYPE):
+        """Build new children container from basic. Current children are not modified
+        so readers can keep using them until the result is assigned
+        """
+        if isinstance(self._children, dict):
+            children = {}
             for name, child in self._children.items():
                 if isinstance(child, Connection) and not child.reload:
-                    reload_false_children[name] = child
+                    children[name] = child
         elif isinstance(self._children, list):
-            reload_false_children = []
+            children = []
             for child in self._children:
                 if isinstance(child, Connection) and not child.reload:
-                    reload_false_children.append(child)
+                    children.append(child)
         else:
-            reload_false_children = type(basic)()
-        self._children = reload_false_children
+            children = type(basic)()
 
         if isinstance(basic, dict):
-            if len(self._children) > 0 and not isinstance(self._children, dict):
+            if len(children) > 0 and not isinstance(children, dict):
                 raise TypeError(f'Connection {self._name} has children with reload=False.'
                                 f' You can\'t change basic type on fly')
             for key, value in basic.items():
                 if any(isinstance(value, x) for x in BASIC_TYPE.__args__):
-                    self._children[key] = Connection(str(key), value, self, self._mutation_callback,
-                                                     self._dump_callback, self._check_callback)
+                    children[key] = Connection(key, value, self)
                 else:
-                    self._children[key] = value
+                    children[key] = value
         elif isinstance(basic, list):
-            if len(self._children) > 0 and not isinstance(self._children, list):
+            if len(children) > 0 and not isinstance(children, list):
                 raise TypeError(f'Connection {self._name} has children with reload=False.'
                                 f' You can\'t change basic type on fly')
             for e, value in enumerate(basic):
                 if any(isinstance(value, x) for x in BASIC_TYPE.__args__):
-                    self._children.append(Connection(str(e), value, self, self._mutation_callback,
-                                                     self._dump_callback, self._check_callback))
+                    children.append(Connection(e, value, self))
                 else:
-                    self._children.append(value)
+                    children.append(value)
         else:
             raise TypeError(f'Unknown basic {type(basic)}')
+        return children
 
     def to_basic(self) -> BASIC_TYPE:
         """Convert Connection to basic type
         :return: dict or list
         """
-        self._check_callback()
+        self._context.check_callback()
         if isinstance(self._children, dict):
             result = {}
             for key, value in self._children.items():
@@ -198,50 +297,79 @@ class Connection(object):
             raise TypeError(f'Unknown children type: {type(self._children)}')
         return result
 
+    @property
+    def _name(self) -> str:
+        """Full connection name. It is built only when needed, e.g. for logging"""
+        keys = []
+        connection = self
+        while connection._parent is not connection:
+            keys.append(str(connection._key))
+            connection = connection._parent
+        keys.append(self._context.name)
+        return '.'.join(reversed(keys))
+
+    def _get_flag(self, flag: str) -> bool:
+        """Returns value of flag set by the latest setter called on connection or its parents.
+        Flags are stored as (value, epoch) tuples or None if flag was not set for connection
+        """
+        connection, value, epoch = self, None, -1
+        while True:
+            stored = getattr(connection, flag)
+            if stored is not None and stored[1] > epoch:
+                value, epoch = stored
+            if connection._parent is connection:
+                return value
+            connection = connection._parent
+
+    def _set_flag(self, flag: str, value: bool):
+        self._context.flags_epoch += 1
+        setattr(self, flag, (value, self._context.flags_epoch))
+
     @property
     def mutable(self) -> bool:
         """
         mutable property
-        When mutable.setter is called, change repeats for every child
+        When mutable.setter is called, change applies to every child
         """
-        return self._mutable
+        return self._get_flag('_mutable')
 
     @mutable.setter
     def mutable(self, value: bool):
-        self._mutable = value
-        for child in (self._children.values() if isinstance(self._children, dict) else self._children):
-            if isinstance(child, Connection):
-                child.mutable = value
+        self._set_flag('_mutable', value)
 
     @property
     def save(self) -> bool:
         """
-        mutable property
-        When save.setter is called, change repeats for every child
+        save property
+        When save.setter is called, change applies to every child
         """
-        return self._save
+        return self._get_flag('_save')
 
     @save.setter
     def save(self, value: bool):
-        self._save = value
-        for child in (self._children.values() if isinstance(self._children, dict) else self._children):
-            if isinstance(child, Connection):
-                child.save = value
+        self._set_flag('_save', value)
 
     @property
     def reload(self) -> bool:
         """
-        mutable property
-        When reload.setter is called, change repeats for every child
+        reload property
+        When reload.setter is called, change applies to every child
         """
-        return self._reload
+        return self._get_flag('_reload')
 
     @reload.setter
     def reload(self, value: bool):
-        self._reload = value
-        for child in (self._children.values() if isinstance(self._children, dict) else self._children):
-            if isinstance(child, Connection):
-                child.reload = value
+        self._set_flag('_reload', value)
+
+
+def _equals(value, other) -> bool:
+    if value is other:
+        return True
+    if isinstance(value, Connection):
+        return value._equals(other)
+    if isinstance(other, Connection):
+        return other._equals(value)
+    return value == other
 
 
 class RootConnection(Connection):
@@ -251,25 +379,57 @@ class RootConnection(Connection):
     """
 
     def __init__(self, name: str = None, logger: logging.Logger = None,
-                 mutable: bool = True, save: bool = True, reload: bool = True):
+                 mutable: bool = True, save: bool = True, reload: bool = True,
+                 background_reload: bool = False, max_staleness: float = None):
         """
         :param name: connection name used for logging configuration (defaults to __name__)
         :param logger: logger for connection. If logger is set passing name is not necessary
         :param mutable: if set to False connection will raise RuntimeError when __setattr__ or __setitem__ called
         :param save: if set to False connection will not call dump function
         :param reload: if set to False connection will not check for stamp update
+        :param background_reload: if set to True data is reloaded in background thread.
+               Readers get previous data until new one is loaded
+        :param max_staleness: seconds readers may get previous data when background_reload is set.
+               When data is older reader waits for reload to finish. Defaults to no limit
         """
-        self._name: str = name or __name__
         self._logger: logging.Logger = logger or logging.getLogger(name)
         self._cached_stamp: int = self.stamp()
 
-        self._mutable: bool = mutable
-        self._save: bool = save
-        self._reload: bool = reload
-        super().__init__(name, self.load(), self,
-                         mutation_callback=self._log_mutation,
+        self._background_reload: bool = background_reload
+        self._max_staleness: float = max_staleness
+        self._reload_condition: threading.Condition = threading.Condition()
+        self._reload_thread: threading.Thread = None
+        self._stale_since: float = None
+        self._generation: int = 0  # Increases on every mutation
+        self._writers: int = 0  # Number of changes in progress. Background reload can't swap data while it is not 0
+        self._thread_writes: threading.local = threading.local()  # Changes in progress in current thread
+
+        self._mutable = (mutable, 0)
+        self._save = (save, 0)
+        self._reload = (reload, 0)
+        super().__init__(name or __name__, self.load(), self,
+                         mutation_callback=self._mutation_callback,
                          dump_callback=self._dump_callback,
-                         check_callback=self._check_callback)
+                         check_callback=self._check_callback,
+                         write_callback=self._write_callback)
+
+    @contextmanager
+    def _write_callback(self):
+        with self._reload_condition:
+            self._writers += 1
+        self._thread_writes.depth = getattr(self._thread_writes, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            self._thread_writes.depth -= 1
+            with self._reload_condition:
+                self._writers -= 1
+                self._reload_condition.notify_all()
+
+    def _mutation_callback(self, name: str, mutation_type: MutationType, new_value):
+        with self._reload_condition:
+            self._generation += 1
+        self._log_mutation(name, mutation_type, new_value)
 
     def _log_mutation(self, name: str, mutation_type: MutationType, new_value, level=None):
         value_to_log = str(new_value)
@@ -283,21 +443,72 @@ class RootConnection(Connection):
         }[mutation_type])
 
     def _dump_callback(self):
-        if self._save is False:
+        if not self.save:
             raise RuntimeError('Called _dump_callback while dump is denied')
         self._logger.debug(f'Saving config {self._name}')
-        self.dump(self.to_basic())
-        self._cached_stamp: int = self.stamp()
+        with self._write_callback():
+            with self._reload_condition:
+                self._generation += 1
+            self._dump_connection()
+            self._cached_stamp: int = self.stamp()
 
     def _check_callback(self):
-        if self._reload is False:
+        if not self.reload:
             return
         new_stamp: int = self.stamp()
-        self._root._logger.debug(f'Cached stamp: {self._cached_stamp} Current stamp: {new_stamp}')
+        self._logger.debug(f'Cached stamp: {self._cached_stamp} Current stamp: {new_stamp}')
 
-        if self._cached_stamp != new_stamp:
+        if self._cached_stamp == new_stamp:
+            return
+        if not self._background_reload:
             self._logger.debug(f'Loading config')
             self._load_from_basic(self.load())
+            self._cached_stamp: int = new_stamp
+            return
+
+        with self._reload_condition:
+            if self._stale_since is None:
+                self._stale_since: float = time.monotonic()
+            if self._reload_thread is None:
+                self._reload_thread = threading.Thread(target=self._reload_worker,
+                                                       name=f'{self._name}-reload', daemon=True)
+                self._reload_thread.start()
+            thread, stale_since = self._reload_thread, self._stale_since
+        # Reload can't finish while current thread changes data, so it must not wait for reload
+        if self._max_staleness is not None and not getattr(self._thread_writes, 'depth', 0) and \
+                time.monotonic() - stale_since >= self._max_staleness:
+            self._logger.debug(f'Data is older than {self._max_staleness}s. Waiting for reload')
+            thread.join()
+
+    def _reload_worker(self):
+        """Builds new children in background and swaps them in.
+        Loading starts and swapping happens only when there are no changes in progress.
+        If data was changed or dumped while loading, loaded data is discarded
+        """
+        try:
+            while True:
+                with self._reload_condition:
+                    self._reload_condition.wait_for(lambda: not self._writers)
+                    generation = self._generation
+                    new_stamp: int = self.stamp()
+                    if new_stamp == self._cached_stamp:
+                        self._stale_since = None
+                        break
+                self._logger.debug(f'Loading config in background')
+                children = self._build_children(self.load())
+                with self._reload_condition:
+                    self._reload_condition.wait_for(lambda: not self._writers)
+                    if generation == self._generation:
+                        self._children = children
+                        self._invalidate()
+                        self._cached_stamp: int = new_stamp
+                        self._stale_since = None
+                        break
+        except Exception:
+            self._logger.exception(f'Background reload of {self._name} failed')
+        finally:
+            with self._reload_condition:
+                self._reload_thread = None
 
     def load(self) -> BASIC_TYPE:
         """Returns parsed data e.g. list or dict. Calls when stamp changes"""
@@ -307,6 +518,13 @@ class RootConnection(Connection):
         """Function called on mutation if dump is True"""
         raise NotImplementedError(f'Function \'dump\' in {self.__class__.__name__} not implemented')
 
+    def _dump_connection(self):
+        """Function called on mutation if dump is True.
+        By default converts connection to basic type and passes it to dump.
+        Override it to serialize connection tree without making a copy
+        """
+        self.dump(self.to_basic())
+
     def stamp(self) -> int:
         """Function called on every request if reload is True.
         If stamp does not equals previously saved stamp load function calls
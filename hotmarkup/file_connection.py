@@ -1,6 +1,6 @@
 import os
 
-from hotmarkup.conenction import RootConnection, BASIC_TYPE
+from hotmarkup.conenction import Connection, RootConnection, BASIC_TYPE
 
 
 class FileConnection(RootConnection):
@@ -26,6 +26,16 @@ class FileConnection(RootConnection):
         self._override: BASIC_TYPE = override
         super().__init__(name=name or path, **kwargs)
 
+    def _apply_override(self, override: BASIC_TYPE):
+        """Dumps override and loads it into existing connection"""
+        with self._write_callback():
+            with self._reload_condition:
+                self._generation += 1
+            self._override: BASIC_TYPE = override
+            self.dump(override)
+            self._load_from_basic(self.load())
+            self._cached_stamp: int = self.stamp()
+
     def load(self) -> BASIC_TYPE:
         return super(FileConnection, self).load()
 
@@ -74,6 +84,92 @@ class YamlConnection(FileConnection):
         with open(self._path, 'w') as file:
             yaml.dump(data, file, self._dumper, **self._dumper_kwargs)
 
+    def _dump_connection(self):
+        with open(self._path, 'w') as file:
+            dumper = self._dumper(file, **self._dumper_kwargs)
+            try:
+                dumper.open()
+                dumper.emit(yaml.DocumentStartEvent(explicit=self._dumper_kwargs.get('explicit_start'),
+                                                    version=self._dumper_kwargs.get('version'),
+                                                    tags=self._dumper_kwargs.get('tags')))
+                _emit_yaml(dumper, self)
+                dumper.emit(yaml.DocumentEndEvent(explicit=self._dumper_kwargs.get('explicit_end')))
+                dumper.close()
+            finally:
+                dumper.dispose()
+
+
+def _represent_yaml(dumper, data):
+    """Represents non-connection value and resets representer state so it does not grow during dump"""
+    node = dumper.represent_data(data)
+    dumper.represented_objects = {}
+    dumper.object_keeper = []
+    dumper.alias_key = None
+    return node
+
+
+def _is_plain_yaml(dumper, data) -> bool:
+    if isinstance(data, Connection):
+        return False
+    node = _represent_yaml(dumper, data)
+    return isinstance(node, yaml.ScalarNode) and not node.style
+
+
+def _emit_yaml_node(dumper, node):
+    """Emits events for node the same way yaml.Serializer does, except anchors"""
+    if isinstance(node, yaml.ScalarNode):
+        detected_tag = dumper.resolve(yaml.ScalarNode, node.value, (True, False))
+        default_tag = dumper.resolve(yaml.ScalarNode, node.value, (False, True))
+        implicit = (node.tag == detected_tag), (node.tag == default_tag)
+        dumper.emit(yaml.ScalarEvent(None, node.tag, implicit, node.value, style=node.style))
+    elif isinstance(node, yaml.SequenceNode):
+        implicit = node.tag == dumper.resolve(yaml.SequenceNode, node.value, True)
+        dumper.emit(yaml.SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+        for item in node.value:
+            _emit_yaml_node(dumper, item)
+        dumper.emit(yaml.SequenceEndEvent())
+    else:
+        implicit = node.tag == dumper.resolve(yaml.MappingNode, node.value, True)
+        dumper.emit(yaml.MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+        for key, value in node.value:
+            _emit_yaml_node(dumper, key)
+            _emit_yaml_node(dumper, value)
+        dumper.emit(yaml.MappingEndEvent())
+
+
+def _emit_yaml(dumper, data):
+    """Emits events for connection tree directly from its children.
+    Output equals to yaml.dump of connection converted to basic type
+    """
+    if not isinstance(data, Connection):
+        _emit_yaml_node(dumper, _represent_yaml(dumper, data))
+        return
+    children = data._children
+    flow_style = dumper.default_flow_style
+    if isinstance(children, dict):
+        items = children.items()
+        if getattr(dumper, 'sort_keys', True):
+            try:
+                items = sorted(items, key=lambda item: item[0])
+            except TypeError:
+                pass
+        if flow_style is None:
+            flow_style = all(_is_plain_yaml(dumper, key) and _is_plain_yaml(dumper, value) for key, value in items)
+        implicit = dumper.DEFAULT_MAPPING_TAG == dumper.resolve(yaml.MappingNode, None, True)
+        dumper.emit(yaml.MappingStartEvent(None, dumper.DEFAULT_MAPPING_TAG, implicit, flow_style=flow_style))
+        for key, value in items:
+            _emit_yaml(dumper, key)
+            _emit_yaml(dumper, value)
+        dumper.emit(yaml.MappingEndEvent())
+    else:
+        if flow_style is None:
+            flow_style = all(_is_plain_yaml(dumper, value) for value in children)
+        implicit = dumper.DEFAULT_SEQUENCE_TAG == dumper.resolve(yaml.SequenceNode, None, True)
+        dumper.emit(yaml.SequenceStartEvent(None, dumper.DEFAULT_SEQUENCE_TAG, implicit, flow_style=flow_style))
+        for value in children:
+            _emit_yaml(dumper, value)
+        dumper.emit(yaml.SequenceEndEvent())
+
 
 try:
     import json
@@ -110,6 +206,76 @@ class JsonConnection(FileConnection):
         with open(self._path, 'w') as file:
             json.dump(data, file, **self._dumper_kwargs)
 
+    def _dump_connection(self):
+        kwargs = dict(self._dumper_kwargs)
+        encoder = (kwargs.pop('cls', None) or json.JSONEncoder)(**kwargs)
+        with open(self._path, 'w') as file:
+            for chunk in _iterencode_json(encoder, self):
+                file.write(chunk)
+
+
+def _iterencode_json(encoder: 'json.JSONEncoder', data, level: int = 0):
+    """Encodes connection tree by chunks directly from its children.
+    Output equals to json.dump of connection converted to basic type
+    """
+    indent = encoder.indent
+    if indent is not None and not isinstance(indent, str):
+        indent = ' ' * indent
+    if not isinstance(data, Connection):
+        chunk = encoder.encode(data)
+        if indent is not None and level:
+            chunk = chunk.replace('\n', '\n' + indent * level)  # JSON strings can't contain raw newlines
+        yield chunk
+        return
+
+    children = data._children
+    is_dict = isinstance(children, dict)
+    if not children:
+        yield '{}' if is_dict else '[]'
+        return
+    yield '{' if is_dict else '['
+    separator = encoder.item_separator
+    if indent is not None:
+        level += 1
+        separator += '\n' + indent * level
+        yield '\n' + indent * level
+
+    if is_dict:
+        items = sorted(children.items(), key=lambda item: item[0]) if encoder.sort_keys else children.items()
+        first = True
+        for key, value in items:
+            if isinstance(key, str):
+                pass
+            elif isinstance(key, float):
+                key = encoder.encode(key)
+            elif key is True:
+                key = 'true'
+            elif key is False:
+                key = 'false'
+            elif key is None:
+                key = 'null'
+            elif isinstance(key, int):
+                key = int.__repr__(key)
+            elif encoder.skipkeys:
+                continue
+            else:
+                raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')
+            if not first:
+                yield separator
+            first = False
+            yield encoder.encode(key)
+            yield encoder.key_separator
+            yield from _iterencode_json(encoder, value, level)
+    else:
+        for e, value in enumerate(children):
+            if e:
+                yield separator
+            yield from _iterencode_json(encoder, value, level)
+
+    if indent is not None:
+        yield '\n' + indent * (level - 1)
+    yield '}' if is_dict else ']'
+
 
 try:
     import pickle
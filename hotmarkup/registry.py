@@ -0,0 +1,168 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+def _freeze(value: Any) -> Hashable:
+    """Converts connection options to hashable value used as part of registry key"""
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+
+class SharedConnection(object):
+    """
+    SharedConnection class
+    It is a handle of connection returned by ConnectionRegistry. Every handle forwards to the same connection,
+    so flags like save or mutable set through one handle apply to all of them
+    """
+    __slots__ = ('_connection', '__weakref__')
+
+    def __init__(self, connection):
+        object.__setattr__(self, '_connection', connection)
+
+    def __getattr__(self, item):
+        return getattr(self._connection, item)
+
+    def __setattr__(self, key, value):
+        setattr(self._connection, key, value)
+
+    def __delattr__(self, item):
+        delattr(self._connection, item)
+
+    def __getitem__(self, item):
+        return self._connection[item]
+
+    def __setitem__(self, key, value):
+        self._connection[key] = value
+
+    def __delitem__(self, key):
+        del self._connection[key]
+
+    def __len__(self):
+        return len(self._connection)
+
+    def __iter__(self):
+        return iter(self._connection)
+
+    def __contains__(self, item):
+        return item in self._connection
+
+    def __iadd__(self, other):
+        self._connection.__iadd__(other)  # += would assign result through __setattr__ to the connection
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, SharedConnection):
+            other = other._connection
+        return self._connection == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._connection)
+
+
+class ConnectionRegistry(object):
+    """
+    ConnectionRegistry class
+    It shares one connection between everyone who opens the same file with the same options,
+    so the file is parsed and its stamp is checked once.
+    Every open returns new SharedConnection handle. Connection is closed when all its handles are garbage collected.
+    Handles do not take part in reference cycles, so it happens as soon as the last one is dropped.
+    Closed connections are kept warm in LRU and reopened without parsing.
+    Connection dropped from LRU is freed by cyclic garbage collector,
+    because every connection references itself through its callbacks
+    """
+
+    def __init__(self, max_warm: int = 8):
+        """
+        :param max_warm: how many closed connections are kept in memory to be reopened without parsing
+        """
+        self._max_warm: int = max_warm
+        self._open: dict = {}  # key: [connection, number of handles]
+        self._warm: OrderedDict = OrderedDict()  # key: connection
+        self._lock: threading.RLock = threading.RLock()
+
+    def open(self, connection_type, path: str, **kwargs) -> SharedConnection:
+        """Returns handle of shared connection for path. Creates connection if there is no one with the same options
+        :param connection_type: FileConnection subclass e.g. JsonConnection
+        :param path: path to file with data
+        :param kwargs: connection_type kwargs. default is used only when connection is created.
+               If override is passed it is dumped and loaded into shared connection
+        """
+        options = {key: value for key, value in kwargs.items() if key not in ('default', 'override')}
+        key = (connection_type, os.path.realpath(path), _freeze(options))
+        override = kwargs.get('override')
+        with self._lock:
+            connection = self._acquire(key)
+        if connection is None:
+            # File is parsed without lock, so opening other files does not wait for it
+            created = connection_type(path, **kwargs)
+            with self._lock:
+                connection = self._acquire(key) or self._acquire(key, created)
+            if connection is created:
+                override = None
+        handle = self._handle(key, connection)
+        if override is not None:
+            connection._apply_override(override)
+        return handle
+
+    def _acquire(self, key, connection=None):
+        """Returns registered connection and counts new handle for it.
+        If there is no registered connection, registers passed one. Must be called with lock
+        """
+        if key in self._open:
+            entry = self._open[key]
+        elif key in self._warm:
+            entry = self._open[key] = [self._warm.pop(key), 0]
+        elif connection is not None:
+            entry = self._open[key] = [connection, 0]
+        else:
+            return None
+        entry[1] += 1
+        return entry[0]
+
+    def _handle(self, key, connection) -> SharedConnection:
+        handle = SharedConnection(connection)
+        weakref.finalize(handle, self._close, key, connection)
+        return handle
+
+    def _close(self, key, connection):
+        """Called when handle is garbage collected. Moves connection to LRU when it has no handles"""
+        with self._lock:
+            entry = self._open.get(key)
+            if entry is None or entry[0] is not connection:  # Registry was cleared
+                return
+            entry[1] -= 1
+            if entry[1]:
+                return
+            del self._open[key]
+            self._warm[key] = connection
+            while len(self._warm) > self._max_warm:
+                self._warm.popitem(last=False)
+
+    def clear(self):
+        """Forgets all connections. Handles still referenced by users keep working"""
+        with self._lock:
+            self._open.clear()
+            self._warm.clear()
+
+    def __len__(self):
+        return len(self._open) + len(self._warm)
+
+
+registry = ConnectionRegistry()
+
+
+def open_shared(connection_type, path: str, **kwargs) -> SharedConnection:
+    """Returns handle of connection shared with other users of the same file and options.
+    See ConnectionRegistry.open
+    """
+    return registry.open(connection_type, path, **kwargs)
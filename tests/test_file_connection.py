@@ -40,13 +40,28 @@ class TestFileConnection(unittest.TestCase):
         connection = connection_type(path, override={'c': 'e'})
         self.assertEqual(connection.to_basic(), {'c', 'e'})
 
+    def _test_dump_connection(self, connection_type, **kwargs):
+        path = tempfile.NamedTemporaryFile(dir=self.dir_path).name
+        connection = connection_type(path, default={'b': [1, 2.5, {'c': None}, [], {}], 'a': 'd\ne', 'h': True},
+                                     **kwargs)
+        connection.b[2].c = {'f': ['g']}
+        with open(path) as file:
+            streamed = file.read()
+        connection.dump(connection.to_basic())
+        with open(path) as file:
+            self.assertEqual(streamed, file.read())
+
     def test_yaml(self):
         self._test_dict_file_connection(YamlConnection)
         self._test_empty_file(YamlConnection)
+        self._test_dump_connection(YamlConnection)
+        self._test_dump_connection(YamlConnection, dumper_kwargs={'default_flow_style': None, 'explicit_start': True})
 
     def test_json(self):
         self._test_dict_file_connection(JsonConnection)
         self._test_empty_file(JsonConnection)
+        self._test_dump_connection(JsonConnection)
+        self._test_dump_connection(JsonConnection, dumper_kwargs={'indent': 2, 'sort_keys': True})
 
     def test_pickle(self):
         self._test_dict_file_connection(PickleConnection)
@@ -0,0 +1,131 @@
+import gc
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import weakref
+
+from hotmarkup import ConnectionRegistry, JsonConnection, YamlConnection, open_shared
+from hotmarkup.registry import registry as shared_registry
+
+
+class SlowJsonConnection(JsonConnection):
+    loading = threading.Event()
+    loaded = threading.Event()
+
+    def load(self):
+        if self._path.endswith('slow.json'):
+            self.loading.set()
+            self.loaded.wait()
+        return super().load()
+
+
+class TestConnectionRegistry(unittest.TestCase):
+    def setUp(self):
+        logging.basicConfig(level=logging.INFO)
+        self.dir_path = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir_path, 'test.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir_path)
+
+    def test_same_connection(self):
+        registry = ConnectionRegistry()
+        handle = registry.open(JsonConnection, self.path, default={'a': 'b'})
+        other = registry.open(JsonConnection, os.path.join(self.dir_path, '.', 'test.json'))
+        self.assertIsNot(other, handle)
+        self.assertIs(other._connection, handle._connection)
+        handle.a = 'c'
+        self.assertEqual(other.a, 'c')
+        self.assertEqual(other, {'a': 'c'})
+
+    def test_different_options(self):
+        registry = ConnectionRegistry()
+        handle = registry.open(JsonConnection, self.path, default={'a': 'b'})
+        self.assertIsNot(registry.open(JsonConnection, self.path, dumper_kwargs={'indent': 2})._connection,
+                         handle._connection)
+        self.assertIsNot(registry.open(YamlConnection, self.path)._connection, handle._connection)
+        self.assertEqual(len(registry), 3)
+
+    def test_override(self):
+        registry = ConnectionRegistry()
+        handle = registry.open(JsonConnection, self.path, default={'a': 'b'})
+        self.assertIs(registry.open(JsonConnection, self.path, override={'a': 'c'})._connection, handle._connection)
+        self.assertEqual(handle.a, 'c')
+        self.assertEqual(JsonConnection(self.path).a, 'c')
+
+    def test_iadd(self):
+        registry = ConnectionRegistry()
+        handle = registry.open(JsonConnection, self.path, default=[0, 1])
+        attributes = dict(vars(handle._connection))
+        handle += [2]
+        self.assertEqual(handle, [0, 1, 2])
+        self.assertEqual(vars(handle._connection).keys(), attributes.keys())
+        self.assertEqual(JsonConnection(self.path).to_basic(), [0, 1, 2])
+
+    def test_parse_without_lock(self):
+        registry = ConnectionRegistry()
+        slow_path = os.path.join(self.dir_path, 'slow.json')
+        handles = []
+        threads = [threading.Thread(target=lambda: handles.append(registry.open(SlowJsonConnection, slow_path,
+                                                                                 default={'a': 'b'})))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        SlowJsonConnection.loading.wait()
+        fast = threading.Thread(target=lambda: registry.open(SlowJsonConnection, self.path, default={'c': 'd'}))
+        fast.start()
+        fast.join(5)
+        SlowJsonConnection.loaded.set()
+        self.assertFalse(fast.is_alive())
+        for thread in threads:
+            thread.join()
+        self.assertIs(handles[0]._connection, handles[1]._connection)
+        self.assertEqual(len(registry), 2)
+
+    def test_flags_shared(self):
+        registry = ConnectionRegistry()
+        handle = registry.open(JsonConnection, self.path, default={'a': 'b'})
+        registry.open(JsonConnection, self.path).mutable = False
+        with self.assertRaises(RuntimeError):
+            handle.a = 'c'
+
+    def test_warm(self):
+        registry = ConnectionRegistry(max_warm=1)
+        connection = weakref.ref(registry.open(JsonConnection, self.path, default={'a': 'b'})._connection)
+        gc.collect()
+        self.assertIs(registry.open(JsonConnection, self.path)._connection, connection())
+
+    def test_eviction(self):
+        registry = ConnectionRegistry(max_warm=1)
+        connection = weakref.ref(registry.open(JsonConnection, self.path, default={'a': 'b'})._connection)
+        registry.open(JsonConnection, os.path.join(self.dir_path, 'other.json'), default={})
+        gc.collect()
+        self.assertIsNone(connection())
+        self.assertEqual(len(registry), 1)
+
+    def test_open_not_counted(self):
+        registry = ConnectionRegistry(max_warm=1)
+        handle = registry.open(JsonConnection, self.path, default={'a': 'b'})
+        closed = weakref.ref(registry.open(JsonConnection, os.path.join(self.dir_path, 'closed.json'),
+                                           default={})._connection)
+        gc.collect()
+        self.assertIsNotNone(closed())
+        self.assertEqual(len(registry), 2)
+        del handle
+        gc.collect()
+        self.assertIsNone(closed())
+        self.assertEqual(len(registry), 1)
+
+    def test_shared(self):
+        self.addCleanup(shared_registry.clear)
+        handle = open_shared(JsonConnection, self.path, default={'a': 'b'})
+        self.assertIs(open_shared(JsonConnection, self.path)._connection, handle._connection)
+
+    def test_shared_key(self):
+        connection = JsonConnection(self.path, default={'shared': False})
+        self.assertIs(connection.shared, False)
+        connection.shared = True
+        self.assertEqual(JsonConnection(self.path).to_basic(), {'shared': True})
@@ -1,4 +1,5 @@
 import logging
+import threading
 import unittest
 
 from hotmarkup.conenction import RootConnection
@@ -56,6 +57,72 @@ class TestRootConnection(unittest.TestCase):
         mock._data = {'a': 'c'}
         self.assertEqual(mock['a'], 'b')
 
+    def test_background_reload(self):
+        mock = RootConnectionMock({'a': 'b'}, background_reload=True)
+        loaded = threading.Event()
+        mock.load = lambda: loaded.wait() and {'a': 'c'}
+        mock._stamp = 1
+        self.assertEqual(mock['a'], 'b')
+        reload_thread = mock._reload_thread
+        loaded.set()
+        reload_thread.join()
+        self.assertEqual(mock['a'], 'c')
+
+    def test_background_reload_during_write(self):
+        mock = RootConnectionMock({'a': 'b'}, background_reload=True)
+        loaded = threading.Event()
+        mock.load = lambda: loaded.wait() and {'a': 'c', 'x': 2}
+        mock._stamp = 1
+        self.assertEqual(mock['a'], 'b')
+        reload_thread = mock._reload_thread
+
+        class FinishReloadHandler(logging.Handler):
+            def emit(self, record):
+                # Tree is already changed but not dumped. Reload must not swap data here
+                loaded.set()
+                reload_thread.join(0.2)
+
+        handler = FinishReloadHandler()
+        with self.assertLogs('mock', level=logging.INFO):
+            logging.getLogger('mock').addHandler(handler)
+            try:
+                mock['a'] = 'LOCAL'
+            finally:
+                logging.getLogger('mock').removeHandler(handler)
+        reload_thread.join()
+        self.assertEqual(mock._dumps, [{'a': 'LOCAL'}])
+        self.assertEqual(mock['a'], 'LOCAL')
+
+    def test_background_reload_max_staleness_other_writer(self):
+        mock = RootConnectionMock({'a': 'b'}, background_reload=True, max_staleness=0)
+        writing, written = threading.Event(), threading.Event()
+
+        def write():
+            with mock._write_callback():
+                writing.set()
+                written.wait()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        writing.wait()
+        mock._stamp = 1
+        mock._data = {'a': 'c'}
+        threading.Timer(0.1, written.set).start()
+        self.assertEqual(mock['a'], 'c')
+        writer.join()
+
+    def test_background_reload_max_staleness(self):
+        mock = RootConnectionMock({'a': 'b'}, background_reload=True, max_staleness=0)
+        mock._stamp = 1
+        mock._data = {'a': 'c'}
+        self.assertEqual(mock['a'], 'c')
+
+    def test_dump_connection_key(self):
+        mock = RootConnectionMock({'dump_connection': 'a'})
+        self.assertEqual(mock.dump_connection, 'a')
+        mock.dump_connection = 'b'
+        self.assertEqual(mock._dumps, [{'dump_connection': 'b'}])
+
     def test_dump(self):
         mock = RootConnectionMock({'a': 'b'})
         mock['a'] = 'c'
@@ -100,6 +167,7 @@ class TestRootConnection(unittest.TestCase):
         mock = RootConnectionMock([0, 1])
         mock += [2, 3]
         self.assertEqual(mock.to_basic(), [0, 1, 2, 3])
+        self.assertEqual(mock._dumps, [[0, 1, 2, 3]])
 
     def test_set_basic(self):
         mock = RootConnectionMock({'a': 'b'})
@@ -185,6 +253,57 @@ class TestRootConnection(unittest.TestCase):
         mock.a.b.c = 'e'
         self.assertEqual(mock.a.b.c, 'e')
 
+    def test_eq(self):
+        mock = RootConnectionMock({'a': {'b': [1, {'c': 'd'}]}, 'e': -1})
+        self.assertEqual(mock, {'e': -1, 'a': {'b': [1, {'c': 'd'}]}})
+        self.assertEqual(mock.a.b, [1, {'c': 'd'}])
+        self.assertNotEqual(mock.a, {'b': [1, {'c': 'e'}]})
+        self.assertNotEqual(mock.a, [])
+        self.assertNotEqual(mock.a, 'a')
+        self.assertEqual(mock, RootConnectionMock({'a': {'b': [1, {'c': 'd'}]}, 'e': -1}))
+        self.assertNotEqual(mock, RootConnectionMock({'a': {'b': [1, {'c': 'd'}]}, 'e': -2}))
+
+    def test_eq_after_mutation(self):
+        mock = RootConnectionMock({'a': {'b': ['c']}})
+        other = RootConnectionMock({'a': {'b': ['c']}})
+        self.assertEqual(mock, other)
+        mock.a.b.append('d')
+        self.assertNotEqual(mock, other)
+        other.a.b[0] = 'd'
+        other.a.b.insert(0, 'c')
+        self.assertEqual(mock, other)
+        del mock.a.b
+        self.assertNotEqual(mock, other)
+
+    def test_func_update_nested(self):
+        mock = RootConnectionMock({'d': {'k': {'x': 1}}})
+        other = RootConnectionMock({'d': {'k': {'x': 1}}})
+        self.assertEqual(mock, other)
+        for i in range(2, 50):
+            with self.assertLogs('mock', level=logging.INFO):
+                mock.d.update({'k': {'x': i}})
+            self.assertEqual(mock._dumps[-1], {'d': {'k': {'x': i}}})
+            self.assertNotEqual(mock, other)
+
+    def test_set_same_basic(self):
+        mock = RootConnectionMock({'a': {'b': [1, {'c': 'd'}]}})
+        with self.assertLogs('mock', level=logging.INFO) as log:
+            mock.a = {'b': [1, {'c': 'd'}]}
+            mock.a.b = [1, {'c': 'e'}]
+            self.assertEqual(log.output, ["INFO:mock:Mutation UPDATE mock.a.b=[1, {'c': 'e'}]"])
+        self.assertEqual(mock._dumps, [{'a': {'b': [1, {'c': 'e'}]}}])
+
+    def test_flags_override(self):
+        mock = RootConnectionMock({'a': {'b': {'c': 'd'}}})
+        mock.a.b.mutable = False
+        self.assertFalse(mock.a.b.mutable)
+        self.assertTrue(mock.a.mutable)
+        mock.a.mutable = True
+        self.assertTrue(mock.a.b.mutable)
+        mock.a.b.c = 'e'
+        mock.mutable = False
+        self.assertFalse(mock.a.b.mutable)
+
     def test_new_log(self):
         mock = RootConnectionMock({})
         with self.assertLogs('mock', level=logging.INFO) as log: